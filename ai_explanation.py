@@ -9,7 +9,6 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt, pyqtSignal, QThread
 from PyQt6.QtGui import QFont
-from transformers import pipeline
 import requests
 
 # 配置日志记录
@@ -496,6 +495,9 @@ class AIExplanationDialog(QDialog):
     def _get_local_explanation(self, prompt):
         """使用本地模型生成解释"""
         try:
+            # transformers 导入很慢，只在使用本地模型时才导入
+            from transformers import pipeline
+
             # 使用 pipeline 进行文本生成
             generator = pipeline(
                 "text-generation",
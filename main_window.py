@@ -917,7 +917,7 @@ class MainWindow(QMainWindow):
     def _check_for_updates(self):
         """检查更新"""
         try:
-            self.update_checker.check_for_updates()
+            self.update_checker.start_update_check()
         except Exception as e:
             logging.error(f"检查更新失败: {e}")
 
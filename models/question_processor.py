@@ -5,9 +5,13 @@ from sklearn.cluster import KMeans
 import json
 from datetime import datetime
 import os
+import threading
 from pathlib import Path
 import logging
 
+# 统计文件的读-改-写在进程内串行执行（考试窗口的后台线程与主界面可能同时处理答题记录）
+_stats_lock = threading.RLock()
+
 class QuestionProcessor:
     """题目处理器"""
     
@@ -71,6 +75,13 @@ class QuestionProcessor:
     
     def process_answer_file(self, answer_file):
         """处理答题记录文件"""
+        with _stats_lock:
+            # 重新读取统计信息，避免覆盖其他处理器在本实例创建之后写入的结果
+            self.question_stats = self._load_question_stats()
+            self._process_answer_file(answer_file)
+
+    def _process_answer_file(self, answer_file):
+        """处理答题记录文件（调用方需持有 _stats_lock）"""
         try:
             with open(answer_file, 'r', encoding='utf-8') as f:
                 answer_data = json.load(f)
@@ -162,8 +173,11 @@ class QuestionProcessor:
             )
             
             # 处理每个历史记录
-            for file in history_files:
-                self.process_answer_file(file)
+            # 持锁期间统计信息只读取一次，逐个文件累计后各自写盘
+            with _stats_lock:
+                self.question_stats = self._load_question_stats()
+                for file in history_files:
+                    self._process_answer_file(file)
                 
         except Exception as e:
             logging.error(f"处理历史记录失败: {e}")
@@ -1,10 +1,21 @@
 import os
 import json
+import functools
+import hashlib
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
 from .bkt_model import BKTModel
 from .forgetting_curve import ForgettingCurve
 from .question_processor import QuestionProcessor
-import random
+
+# 旧题复习优先级参数
+FORGET_ALPHA = 0.3    # 每次答对后遗忘速率的衰减比例
+FORGET_BETA = 0.5     # 每次答错（或查看答案）后遗忘速率的增长比例
+
+# 标准答案缓存目录（data/static 为安装资源目录，可能只读，缓存写到可写的模型数据目录）
+ANSWER_CACHE_DIR = os.path.join('data', 'models', 'cache')
 
 class Recommender:
     """智能推荐系统"""
@@ -13,6 +24,9 @@ class Recommender:
         self.bkt_model = BKTModel()
         self.forgetting_curve = ForgettingCurve()
         self.question_processor = QuestionProcessor()
+        # 标准答案缓存及其来源（题库路径, 修改时间）
+        self._answer_key = None
+        self._answer_key_source = None
         
     def process_answer_history(self, answer_json_path):
         """处理答题历史"""
@@ -22,21 +36,17 @@ class Recommender:
                 answer_data = json.load(f)
                 
             # 转换答题记录格式
-            answer_history = {}
+            timestamp = answer_data['timestamp']
+            correct_answers = answer_data.get('correct_answers', {})
+            answer_history = defaultdict(list)
             for q_id, answer in answer_data['answers'].items():
-                if q_id not in answer_history:
-                    answer_history[q_id] = []
-                    
-                # 判断答案是否正确
-                is_correct = answer == answer_data.get('correct_answers', {}).get(q_id)
-                
                 answer_history[q_id].append({
                     'answer': answer,
-                    'is_correct': is_correct,
-                    'timestamp': answer_data['timestamp']
+                    'is_correct': answer == correct_answers.get(q_id),
+                    'timestamp': timestamp
                 })
                 
-            return answer_history
+            return dict(answer_history)
         except Exception as e:
             print(f"处理答题历史失败: {str(e)}")
             return None
@@ -70,70 +80,185 @@ class Recommender:
         
     def generate_recommendation(self, xlsx_path, answer_json_paths, num_questions=50):
         # 1. 读取题库
-        df = pd.read_excel(xlsx_path)
-        correct_answers = {str(i): str(row['答案']).strip().upper() for i, row in df.iterrows()}
-        total_questions = len(df)
-
-        # 2. 合并所有答题记录
-        user_history = {}
-        for json_path in answer_json_paths:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            for idx_str, user_ans in data.get('user_answers', {}).items():
-                idx = int(idx_str)
-                if idx not in user_history:
-                    user_history[idx] = {'wrong_count': 0, 'view_answer_count': 0, 'total_time': 0.0}
-                if str(user_ans).strip().upper() != correct_answers.get(idx_str, ''):
-                    user_history[idx]['wrong_count'] += 1
-                # 可统计view_answer_count、total_time等
+        answer_key = self._load_answer_key(xlsx_path)
 
-        # 3. 推荐逻辑（错题优先，未做题次之，已掌握题目偶尔出现）
-        all_questions = list(range(total_questions))
-        new_questions = [i for i in all_questions if i not in user_history]
-        old_questions = [i for i in all_questions if i in user_history]
-        old_questions_sorted = sorted(
-            old_questions,
-            key=lambda i: (
-                -user_history[i]['wrong_count'],
-                -user_history[i]['view_answer_count'],
-                -user_history[i]['total_time']
-            )
+        # 2. 合并所有答题记录（多线程并行读取，重叠磁盘I/O）
+        with ThreadPoolExecutor(max_workers=min(8, len(answer_json_paths) or 1)) as executor:
+            all_user_answers = list(executor.map(_read_user_answers, answer_json_paths))
+        answer_idx = []
+        answer_values = []
+        for user_answers in all_user_answers:
+            answer_idx.extend(map(int, user_answers.keys()))
+            answer_values.extend(user_answers.values())
+        seen, wrong, correct, view, total_time = _accumulate_answers(
+            np.array(answer_idx, dtype=np.int64),
+            _normalize_answers(pd.Series(answer_values, dtype=object)),
+            answer_key
         )
-        num_new = int(num_questions * 0.6)
-        num_old = num_questions - num_new
-        selected_new = random.sample(new_questions, min(num_new, len(new_questions)))
-        selected_old = old_questions_sorted[:num_old]
-        question_order = selected_new + selected_old
-        random.shuffle(question_order)
-        # 补足题目
-        if len(question_order) < num_questions:
-            supplement = [i for i in old_questions_sorted if i not in question_order]
-            question_order += supplement[:num_questions - len(question_order)]
-        if len(question_order) < num_questions:
-            supplement = [i for i in new_questions if i not in question_order]
-            question_order += supplement[:num_questions - len(question_order)]
-        question_order = question_order[:num_questions]
-        return question_order
+
+        # 3. 推荐逻辑（错题优先，未做题次之，已掌握题目偶尔出现）
+        return _select_question_order(seen, wrong, correct, view, total_time, num_questions, 0.6)
+
+    def _load_answer_key(self, xlsx_path):
+        """读取题库标准答案，题库文件未变化时直接复用上次的结果"""
+        source = (xlsx_path, os.stat(xlsx_path).st_mtime_ns)
+        if self._answer_key_source != source:
+            self._answer_key = _load_cached_answer_key(xlsx_path)
+            self._answer_key_source = source
+        return self._answer_key
 
     def get_recommendation_summary(self, recommendation_path):
         """获取推荐结果摘要"""
         try:
-            with open(recommendation_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
-            return {
-                'recommendation_count': len(data['recommendation']),
-                'timestamp': data['timestamp'],
-                'model_info': data.get('model_info', {})
-            }
+            return _load_recommendation_summary(
+                recommendation_path, os.stat(recommendation_path).st_mtime_ns
+            )
         except Exception as e:
             print(f"获取推荐摘要失败: {str(e)}")
             return None
 
+def _history_arrays(user_history, total_questions):
+    """将用户历史字典转换为按题目索引对齐的数组：(是否做过, 错误次数, 正确次数, 查看答案次数, 总用时)"""
+    count = len(user_history)
+    records = user_history.values()
+    # 直接从keys()/values()视图构建数组，旧题即历史中的题号，无需逐题做成员判断
+    idx = np.fromiter(user_history.keys(), dtype=np.int64, count=count)
+    in_range = (idx >= 0) & (idx < total_questions)
+    idx = idx[in_range]
+
+    def column(field, dtype):
+        values = np.zeros(total_questions, dtype=dtype)
+        values[idx] = np.fromiter((r[field] for r in records), dtype=dtype, count=count)[in_range]
+        return values
+
+    seen = np.zeros(total_questions, dtype=bool)
+    seen[idx] = True
+    wrong = column('wrong_count', np.int32)
+    correct = column('correct_count', np.int32)
+    view = column('view_answer_count', np.int32)
+    total_time = column('total_time', np.float64)
+    return seen, wrong, correct, view, total_time
+
+def _normalize_answers(answers):
+    """将答案列统一为去空白的大写字符串数组"""
+    return answers.astype(str).str.strip().str.upper().to_numpy()
+
+def _load_cached_answer_key(xlsx_path):
+    """读取题库标准答案；首次解析Excel后转存为缓存目录下的.npy文件，题库未更新时直接加载缓存"""
+    xlsx_path = os.fspath(xlsx_path)
+    # 文件名带上题库绝对路径的哈希，不同目录下的同名题库互不覆盖
+    path_hash = hashlib.md5(os.path.abspath(xlsx_path).encode('utf-8')).hexdigest()[:8]
+    cache_path = os.path.join(ANSWER_CACHE_DIR, f"{os.path.basename(xlsx_path)}.{path_hash}.answers.npy")
+    try:
+        if os.stat(cache_path).st_mtime_ns >= os.stat(xlsx_path).st_mtime_ns:
+            return np.load(cache_path)
+    except (OSError, ValueError, EOFError):
+        # 缓存不存在、已过期或内容损坏（如空文件），重新解析Excel
+        pass
+    df = pd.read_excel(xlsx_path, usecols=['答案'])
+    answer_key = _normalize_answers(df['答案']).astype(str)
+    try:
+        # 先写临时文件再替换，避免写入中断留下比题库更新的损坏缓存
+        os.makedirs(ANSWER_CACHE_DIR, exist_ok=True)
+        tmp_path = cache_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, answer_key)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"写入答案缓存失败: {str(e)}")
+    return answer_key
+
+def _accumulate_answers(answer_idx, answer_values, answer_key):
+    """将答题记录与标准答案按题目索引对齐比较并累计，返回与_history_arrays相同结构的数组"""
+    total_questions = len(answer_key)
+    in_range = (answer_idx >= 0) & (answer_idx < total_questions)
+    answer_idx = answer_idx[in_range]
+    answer_wrong = answer_values[in_range] != answer_key[answer_idx]
+    seen = np.zeros(total_questions, dtype=bool)
+    seen[answer_idx] = True
+    wrong = np.bincount(answer_idx[answer_wrong], minlength=total_questions).astype(np.int32)
+    correct = np.bincount(answer_idx[~answer_wrong], minlength=total_questions).astype(np.int32)
+    # 答案文件中暂无查看答案次数和用时信息
+    view = np.zeros(total_questions, dtype=np.int32)
+    total_time = np.zeros(total_questions, dtype=np.float64)
+    return seen, wrong, correct, view, total_time
+
+def _review_priority(wrong, correct, view):
+    """计算旧题的复习优先级（越大越优先）：正确次数 * log(1-ALPHA) + (错误次数+查看答案次数) * log(1+BETA)
+
+    即遗忘速率 (1-ALPHA)^正确次数 * (1+BETA)^(错误次数+查看答案次数) 的对数，只用于排序；
+    按默认参数，答对一次约抵消 0.88 次答错。直接用线性形式，避免 1 - exp(-n) 在错误次数较多时饱和为 1.0。
+    """
+    return correct * np.log(1 - FORGET_ALPHA) + (wrong + view) * np.log(1 + FORGET_BETA)
+
+def _rank_old_questions(seen, wrong, correct, view, total_time):
+    """旧题排序：复习优先级降序，其次总用时降序（同分保持题号升序）"""
+    old_idx = np.nonzero(seen)[0]
+    priority = _review_priority(wrong[old_idx], correct[old_idx], view[old_idx])
+    order = np.lexsort((-total_time[old_idx], -priority))
+    return old_idx[order].tolist()
+
+def _select_question_order(seen, wrong, correct, view, total_time, num_questions, new_ratio, rng=None):
+    """按新旧题比例选出题目顺序：新题随机抽取，旧题按复习优先级，不足时依次用旧题、新题补足"""
+    if rng is None:
+        rng = np.random.default_rng()
+    new_questions = np.flatnonzero(~seen)
+    old_questions_sorted = _rank_old_questions(seen, wrong, correct, view, total_time)
+    num_new = int(num_questions * new_ratio)
+    num_old = num_questions - num_new
+    selected_new = rng.choice(new_questions, size=min(num_new, new_questions.size), replace=False)
+    selected_old = np.array(old_questions_sorted[:num_old], dtype=new_questions.dtype)
+    question_order = rng.permutation(np.concatenate((selected_new, selected_old))).tolist()
+    # 补足题目（用集合做成员判断，避免对列表逐个线性查找）
+    chosen = set(question_order)
+    if len(question_order) < num_questions:
+        supplement = [i for i in old_questions_sorted if i not in chosen]
+        question_order += supplement[:num_questions - len(question_order)]
+        chosen.update(question_order)
+    if len(question_order) < num_questions:
+        supplement = [i for i in new_questions.tolist() if i not in chosen]
+        question_order += supplement[:num_questions - len(question_order)]
+    return question_order[:num_questions]
+
+def _scan_answer_files(answer_dir):
+    """扫描答题记录目录，返回所有answer_*.json文件路径"""
+    with os.scandir(answer_dir) as it:
+        return [
+            entry.path for entry in it
+            if entry.name.startswith('answer_') and entry.name.endswith('.json') and entry.is_file()
+        ]
+
+def _read_user_answers(json_path):
+    """读取单个答题记录文件，返回其中的user_answers字典"""
+    return _parse_user_answers(json_path, os.stat(json_path).st_mtime_ns)
+
+@functools.lru_cache(maxsize=1024)
+def _parse_user_answers(json_path, mtime_ns):
+    """解析答题记录文件（按文件修改时间缓存，未变化的文件不再重复解析）"""
+    with open(json_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return data.get('user_answers', {})
+
+@functools.lru_cache(maxsize=32)
+def _load_recommendation_summary(recommendation_path, mtime_ns):
+    """读取推荐结果摘要（按文件修改时间缓存，文件变化后自动失效）"""
+    with open(recommendation_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return {
+        'recommendation_count': len(data['recommendation']),
+        'timestamp': data['timestamp'],
+        'model_info': data.get('model_info', {})
+    }
+
 def load_user_history(history_path):
-    """加载用户历史答题数据，返回字典：{题目索引: {'wrong_count': int, 'view_answer_count': int, 'total_time': float}}"""
+    """加载用户历史答题数据，返回字典：{题目索引: {'wrong_count': int, 'correct_count': int, 'view_answer_count': int, 'total_time': float}}"""
     if not os.path.exists(history_path):
         return {}
+    return _load_user_history(history_path, os.stat(history_path).st_mtime_ns)
+
+@functools.lru_cache(maxsize=32)
+def _load_user_history(history_path, mtime_ns):
+    """解析用户历史文件（按文件修改时间缓存，文件变化后自动失效）"""
     with open(history_path, 'r', encoding='utf-8') as f:
         data = json.load(f)
     # 假设history.json结构为 {"answers": {题号: {...}}, ...}
@@ -143,38 +268,16 @@ def load_user_history(history_path):
         idx = int(k)
         history[idx] = {
             'wrong_count': v.get('wrong_count', 0),
+            'correct_count': v.get('correct_count', 0),
             'view_answer_count': v.get('view_answer_count', 0),
             'total_time': v.get('total_time', 0.0)
         }
     return history
 
 def generate_recommendation(total_questions=740, num_questions=50, new_ratio=0.6, history_path='user_history.json', output_path='project/models/recommendation.json'):
-    all_questions = list(range(total_questions))
     user_history = load_user_history(history_path)
-    new_questions = [i for i in all_questions if i not in user_history]
-    old_questions = [i for i in all_questions if i in user_history]
-    old_questions_sorted = sorted(
-        old_questions,
-        key=lambda i: (
-            -user_history[i]['wrong_count'],
-            -user_history[i]['view_answer_count'],
-            -user_history[i]['total_time']
-        )
-    )
-    num_new = int(num_questions * new_ratio)
-    num_old = num_questions - num_new
-    selected_new = random.sample(new_questions, min(num_new, len(new_questions)))
-    selected_old = old_questions_sorted[:num_old]
-    question_order = selected_new + selected_old
-    random.shuffle(question_order)
-    # 补足题目
-    if len(question_order) < num_questions:
-        supplement = [i for i in old_questions_sorted if i not in question_order]
-        question_order += supplement[:num_questions - len(question_order)]
-    if len(question_order) < num_questions:
-        supplement = [i for i in new_questions if i not in question_order]
-        question_order += supplement[:num_questions - len(question_order)]
-    question_order = question_order[:num_questions]
+    seen, wrong, correct, view, total_time = _history_arrays(user_history, total_questions)
+    question_order = _select_question_order(seen, wrong, correct, view, total_time, num_questions, new_ratio)
     with open(output_path, 'w', encoding='utf-8') as f:
         json.dump({'question_order': question_order}, f, ensure_ascii=False, indent=2)
     print(f'已生成推荐顺序，写入{output_path}')
@@ -183,7 +286,7 @@ if __name__ == '__main__':
     # 示例用法
     xlsx_path = 'data/static/单选题.xlsx'
     answer_dir = 'data/answers'
-    answer_json_paths = [os.path.join(answer_dir, f) for f in os.listdir(answer_dir) if f.endswith('.json') and f.startswith('answer_')]
+    answer_json_paths = _scan_answer_files(answer_dir)
     recommender = Recommender()
     question_order = recommender.generate_recommendation(xlsx_path, answer_json_paths, num_questions=50)
     print('推荐题目顺序:', question_order) 
\ No newline at end of file
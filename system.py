@@ -1,22 +1,187 @@
 import sys
-import pandas as pd
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QGridLayout, QPushButton, QLabel, QRadioButton, QButtonGroup,
     QScrollArea, QFrame, QFileDialog, QMessageBox, QTextEdit,
 )
-from PyQt6.QtCore import QTimer, Qt, pyqtSignal
+from PyQt6.QtCore import QTimer, Qt, QEvent, pyqtSignal, QRunnable, QThreadPool, QSignalBlocker
 from PyQt6.QtGui import QFont
 import json
+import mmap
 import os
+import time
 from datetime import datetime
-import random
+import functools
 from pathlib import Path
 import logging
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # 导入 AI 解答模块
 from ai_explanation import AIExplanationDialog
 
+# 题号按钮样式
+STYLE_CORRECT = "QPushButton { background-color: #4CAF50; color: white; }"  # 答对（提交后）
+STYLE_WRONG = "QPushButton { background-color: #ff4444; color: white; }"  # 答错（提交后）
+STYLE_UNANSWERED = "QPushButton { background-color: #cccccc; color: black; }"  # 未作答（提交后）
+STYLE_VIEWED = "QPushButton { background-color: #FFA500; color: white; }"  # 查看过答案
+STYLE_ANSWERED = STYLE_CORRECT  # 已作答
+STYLE_CURRENT = "QPushButton { background-color: #2196F3; color: white; }"  # 当前题目
+STYLE_DISABLED = "QPushButton { background-color: #cccccc; }"  # 无题目
+STYLE_DEFAULT = ""
+
+# 不小于该大小的 JSON 文件通过 mmap 交给 orjson 解析，避免再复制一份文件内容
+JSON_MMAP_MIN_SIZE = 64 * 1024
+
+# 选项字母及其在题库中对应的列名
+OPTION_LETTERS = ('A', 'B', 'C', 'D')
+OPTION_COLUMNS = ('选项A', '选项B', '选项C', '选项D')
+
+# 倒计时最后5分钟的闪烁样式
+TIMER_STYLE_RED = "color: red; font-weight: bold;"
+TIMER_STYLE_DARKRED = "color: darkred; font-weight: bold;"
+
+
+def load_question_bank(file_path):
+    """读取题库，返回 (列名列表, 题目记录列表)
+
+    解析结果按 (路径, 修改时间, 文件大小) 缓存，重复加载同一题库时无需再次解析Excel。
+    题目记录已经过 annotate_question 处理，且会被多次加载共享，调用方不应修改。
+    """
+    st = os.stat(file_path)
+    return _read_question_bank(os.path.abspath(file_path), st.st_mtime_ns, st.st_size)
+
+
+@functools.lru_cache(maxsize=4)
+def _read_question_bank(file_path, mtime_ns, size):
+    """解析Excel题库（由 load_question_bank 调用，参数中的修改时间和大小仅用作缓存键）"""
+    if file_path.lower().endswith('.xls'):
+        # 旧版 .xls 格式 openpyxl 不支持，仍交给 pandas 处理（pandas 导入较慢，仅在此时导入）
+        import pandas as pd
+        df = pd.read_excel(file_path)
+        columns, records = list(df.columns), df.to_dict('records')
+    else:
+        # 只读模式逐行读取第一个工作表，不构建 DataFrame
+        import openpyxl
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            columns = list(next(rows, ()))
+            records = [dict(zip(columns, row)) for row in rows]
+        finally:
+            workbook.close()
+        # 与 pd.read_excel 保持一致：只去掉末尾的空行，中间的空行保留为记录，
+        # 保证题目下标与 QuestionProcessor、推荐模块及已保存答题文件中的行号对应
+        while records and all(value is None for value in records[-1].values()):
+            records.pop()
+
+    if '答案' in columns:
+        for record in records:
+            annotate_question(record)
+    return columns, records
+
+def annotate_question(question):
+    """预先计算题目的标准答案字符串和单选/多选标记，避免每次渲染、提交时重复处理字符串
+
+    answer_norm 为去掉首尾空白的答案，判断正误的规则与原先逐题比较 str(答案).strip() 相同。
+    """
+    ans = str(question['答案']).strip()
+    question['answer_norm'] = ans
+    question['is_multi'] = len(ans) > 1
+    return question
+
+def dump_json(file_path, data):
+    """以 UTF-8、两空格缩进写入 JSON 文件，安装了 orjson 时使用 orjson 序列化
+
+    先写入同目录下的临时文件再用 os.replace 替换，写入中途出错不会损坏原文件。
+    """
+    tmp_path = f"{file_path}.tmp"
+    if orjson is not None:
+        content = orjson.dumps(
+            data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+    else:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, file_path)
+
+def load_json(file_path):
+    """读取 JSON 文件，安装了 orjson 时用 orjson 解析
+
+    较大的文件映射到内存后直接解析；小文件映射的开销比一次 read 更大，仍整体读入。
+    """
+    with open(file_path, 'rb') as f:
+        if orjson is not None and os.fstat(f.fileno()).st_size >= JSON_MMAP_MIN_SIZE:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                return orjson.loads(view)
+        content = f.read()
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+def list_user_save_files(save_dir, username):
+    """列出保存目录下该用户的临时答题文件（answers_<用户名>_*.json）"""
+    prefix = f"answers_{username}_"
+    try:
+        with os.scandir(save_dir) as entries:
+            return [
+                entry.path for entry in entries
+                if entry.name.startswith(prefix) and entry.name.endswith('.json') and entry.is_file()
+            ]
+    except FileNotFoundError:
+        return []
+
+def _process_all_history(username):
+    """处理用户的所有历史答题记录，生成初始推荐"""
+    from models.question_processor import QuestionProcessor
+    processor = QuestionProcessor(username)
+    processor.process_all_history()
+
+def _remove_user_save_files(save_dir, username):
+    """删除该用户在保存目录下的所有临时答题文件"""
+    for temp_file in list_user_save_files(save_dir, username):
+        try:
+            os.unlink(temp_file)
+            logging.info(f"成功删除临时文件: {temp_file}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.error(f"删除临时文件失败 {temp_file}: {e}")
+
+_io_pool = None
+
+
+def get_io_pool():
+    """返回所有考试窗口共用的后台线程池
+
+    只用一个线程，保证各窗口的文件写入、清理和历史记录处理按提交顺序依次执行。
+    """
+    global _io_pool
+    if _io_pool is None:
+        _io_pool = QThreadPool()
+        _io_pool.setMaxThreadCount(1)
+    return _io_pool
+
+class BackgroundTask(QRunnable):
+    """在线程池中执行的后台任务，出错时只记录日志"""
+
+    def __init__(self, description, func, *args):
+        super().__init__()
+        self.description = description
+        self.func = func
+        self.args = args
+
+    def run(self):
+        try:
+            self.func(*self.args)
+        except Exception as e:
+            logging.error(f"{self.description}失败: {e}")
+
 class QuestionSystem(QMainWindow):
     # 定义信号
     answer_submitted = pyqtSignal(dict)
@@ -30,11 +195,20 @@ class QuestionSystem(QMainWindow):
         self.user_answers = {}
         self.total_time = 60 * 60  # 60分钟倒计时
         self.remaining_time = self.total_time
+        self._deadline = None  # 倒计时截止时刻（time.monotonic() 时钟）
         self.viewed_answers = set()  # 记录用户查看过答案的题目索引
+        # 已作答/已查看答案题目的位掩码（第 i 位对应第 i 题），供刷新题号按钮时快速判断
+        self._answered_mask = 0
+        self._viewed_mask = 0
         self.submitted = False  # 是否已提交
         self.start_time = None  # 记录开始时间
         self.current_answer_file = None  # 当前答题文件路径
         self.ai_explanation_dialog = None # AI解答对话框实例
+        self._timer_style = None  # 倒计时标签当前样式，避免重复设置
+        self._save_dir = os.path.join('data', 'recommendation', 'save')  # 临时保存目录，启动时创建一次
+        self._update_save_data_static()  # 保存文件中整场考试不变的字段
+        # 文件读写放到后台线程执行（进程内共用一个单线程池）
+        self._io_pool = get_io_pool()
 
         # 初始化必要的目录和文件
         self._init_directories_and_files()
@@ -49,11 +223,31 @@ class QuestionSystem(QMainWindow):
 
         # 设置定时器
         self.timer = QTimer()
+        # 倒计时只显示到秒，使用粗粒度定时器减少唤醒次数
+        self.timer.setTimerType(Qt.TimerType.CoarseTimer)
         self.timer.timeout.connect(self.update_timer)
+        # 窗口最小化时不刷新倒计时，只在截止时刻触发一次，保证到时仍会自动提交
+        self._deadline_timer = QTimer(self)
+        self._deadline_timer.setSingleShot(True)
+        self._deadline_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._deadline_timer.timeout.connect(self.update_timer)
+
+        # 自动保存防抖：最后一次改动答案2秒后保存一次，连续作答时只保存一次
+        self._save_debounce = QTimer(self)
+        self._save_debounce.setSingleShot(True)
+        self._save_debounce.setInterval(2000)
+        self._save_debounce.timeout.connect(self.auto_save_answers)
 
         # 尝试加载本地xlsx文件
         self.load_local_excel()
 
+        # 窗口显示后再开始后台初始化
+        QTimer.singleShot(0, self._background_init)
+
+    def _background_init(self):
+        """处理所有历史记录，生成初始推荐（后台线程执行，不阻塞窗口显示）"""
+        self._io_pool.start(BackgroundTask("初始化推荐", _process_all_history, self.username))
+
     def _init_directories_and_files(self):
         """初始化必要的目录和文件"""
         try:
@@ -70,27 +264,17 @@ class QuestionSystem(QMainWindow):
             # 初始化题目统计文件
             stats_file = Path("data/models/question_stats.json")
             if not stats_file.exists():
-                with open(stats_file, 'w', encoding='utf-8') as f:
-                    json.dump({}, f, ensure_ascii=False, indent=2)
+                dump_json(stats_file, {})
 
             # 初始化推荐文件
             recommendation_file = Path("data/models/model_yh/recommendation.json")
             if not recommendation_file.exists():
-                with open(recommendation_file, 'w', encoding='utf-8') as f:
-                    json.dump({
-                        'timestamp': datetime.now().isoformat(),
-                        'username': self.username,
-                        'question_weights': {},
-                        'recommended_questions': []
-                    }, f, ensure_ascii=False, indent=2)
-
-            # 处理所有历史记录，生成初始推荐
-            try:
-                from models.question_processor import QuestionProcessor
-                processor = QuestionProcessor(self.username)
-                processor.process_all_history()
-            except Exception as e:
-                logging.error(f"初始化推荐失败: {e}")
+                dump_json(recommendation_file, {
+                    'timestamp': datetime.now().isoformat(),
+                    'username': self.username,
+                    'question_weights': {},
+                    'recommended_questions': []
+                })
 
         except Exception as e:
             logging.error(f"初始化目录和文件失败: {e}")
@@ -174,6 +358,8 @@ class QuestionSystem(QMainWindow):
             col = i % 5
             self.question_grid.addWidget(btn, row, col)
             self.question_buttons.append(btn)
+        # 记录每个按钮最近一次设置的 (是否启用, 样式)，状态不变时跳过 setStyleSheet
+        self._button_states = [None] * len(self.question_buttons)
 
         scroll_area.setWidget(scroll_widget)
         scroll_area.setWidgetResizable(True)
@@ -268,13 +454,15 @@ class QuestionSystem(QMainWindow):
         self.option_group.setExclusive(False)
         self.option_buttons = []
         
-        for i, option_text in enumerate(['A', 'B', 'C', 'D']):
+        for i, option_text in enumerate(OPTION_LETTERS):
             option_btn = QRadioButton(f"{option_text}. ")
             option_btn.setFont(QFont("微软雅黑", 11))
             option_btn.setEnabled(False)
             self.option_group.addButton(option_btn, i)
             self.option_buttons.append(option_btn)
             self.options_layout.addWidget(option_btn)
+        # 选项按钮在切换题目时复用，信号只需连接一次
+        self.option_group.buttonClicked.connect(self.save_current_answer)
             
         content_layout.addLayout(self.options_layout)
 
@@ -380,9 +568,8 @@ class QuestionSystem(QMainWindow):
         self.question_text.setText("没有题库，请点击左侧'加载Excel文件'按钮导入题目")
 
         # 禁用所有控制按钮
-        for btn in self.question_buttons:
-            btn.setEnabled(False)
-            btn.setStyleSheet("QPushButton { background-color: #cccccc; }")
+        for i in range(len(self.question_buttons)):
+            self._set_question_button_state(i, False, STYLE_DISABLED)
 
         for btn in self.option_buttons:
             btn.setEnabled(False)
@@ -394,23 +581,23 @@ class QuestionSystem(QMainWindow):
     def load_excel_from_path(self, file_path):
         """从指定路径加载Excel文件"""
         try:
-            df = pd.read_excel(file_path)
-            required_columns = ['题号', '题目', '选项A', '选项B', '选项C', '选项D', '答案']
-            if all(col in df.columns for col in required_columns):
-                original_data = df.to_dict('records')
-                # 每次都重新初始化题目顺序
-                self.original_indices = random.sample(range(len(original_data)), 50)
-                self.questions = [original_data[i] for i in self.original_indices]
-                
-                # 新增：判断单选/多选
-                for q in self.questions:
-                    ans = str(q['答案']).strip()
-                    q['is_multi'] = len(ans) > 1
+            columns, original_data = load_question_bank(file_path)
+            required_columns = ['题号', '题目', *OPTION_COLUMNS, '答案']
+            if all(col in columns for col in required_columns):
+                # 每次都重新初始化题目顺序（题目记录只读共享，无需复制）
+                import numpy as np
+                rng = np.random.default_rng()
+                sample_size = min(50, len(original_data))
+                self.original_indices = rng.choice(len(original_data), size=sample_size, replace=False).tolist()
+                self.questions = list(map(original_data.__getitem__, self.original_indices))
                 
                 self.current_question = 0
                 self.user_answers = {}
+                self._rebuild_answer_masks()
                 self.submitted = False
                 self.start_time = datetime.now()  # 记录开始时间
+                self.current_answer_file = None  # 新的考试写入新的保存文件，不覆盖上一场
+                self._update_save_data_static()
                 
                 # 启用界面控件
                 self.enable_interface()
@@ -418,8 +605,7 @@ class QuestionSystem(QMainWindow):
                 self.update_question_buttons()
                 
                 # 重置并开始倒计时
-                self.remaining_time = self.total_time
-                self.timer.start(1000)
+                self._start_countdown(self.total_time)
                 
                 # 创建保存目录
                 os.makedirs('data/recommendation', exist_ok=True)
@@ -456,139 +642,103 @@ class QuestionSystem(QMainWindow):
             self.show_no_questions_message()
             return
             
-        # 断开之前的信号连接
-        try:
-            self.option_group.buttonClicked.disconnect(self.save_current_answer)
-        except:
-            pass
-            
-        # 清除旧的按钮组
-        for btn in self.option_buttons:
-            self.option_group.removeButton(btn)
-            self.options_layout.removeWidget(btn)
-            btn.deleteLater()
-            
-        # 创建新的按钮组
-        self.option_group = QButtonGroup()
-        self.option_buttons = []
-        
         question = self.questions[self.current_question]
-        # 设置单选/多选模式
-        self.option_group.setExclusive(not question.get('is_multi', False))
-        
-        # 创建新的选项按钮
-        options = [question['选项A'], question['选项B'], question['选项C'], question['选项D']]
-        for i, option_text in enumerate(options):
-            option_btn = QRadioButton(option_text)
-            option_btn.setFont(QFont("微软雅黑", 11))
-            option_btn.setEnabled(not self.submitted and self.current_question not in self.viewed_answers)
-            self.option_group.addButton(option_btn, i)
-            self.option_buttons.append(option_btn)
-            self.options_layout.addWidget(option_btn)
+        viewed = bool(self._viewed_mask >> self.current_question & 1)
+        # 查看过答案或已提交后不能再修改选项
+        editable = not viewed and not self.submitted
+
+        # 复用已有的选项按钮，一次性更新文字、启用状态并恢复用户之前的选择
+        # 单选、多选答案均为按选项顺序拼接的字母串，如 "A"、"AC"
+        checked = set(self.user_answers.get(self.current_question, ''))
+        with QSignalBlocker(self.option_group):
+            # 独占模式下无法取消已选中的按钮，先关闭独占，恢复选择后再按单选/多选设置
+            self.option_group.setExclusive(False)
+            for letter, column, btn in zip(OPTION_LETTERS, OPTION_COLUMNS, self.option_buttons):
+                btn.setText(question[column])
+                btn.setChecked(letter in checked)
+                btn.setEnabled(editable)
+            self.option_group.setExclusive(not question['is_multi'])
             
         # 更新题号
         self.current_question_label.setText(f"第 {self.current_question + 1} 题 / 共 {len(self.questions)} 题")
         
         # 更新题目内容
         self.question_text.setText(question['题目'])
-            
-        # 恢复用户之前的选择
-        if self.current_question in self.user_answers:
-            answer = self.user_answers[self.current_question]
-            if question.get('is_multi', False):
-                # 多选，answer为字符串如"AC"
-                for i, btn in enumerate(self.option_buttons):
-                    if chr(ord('A') + i) in answer:
-                        btn.setChecked(True)
-            else:
-                # 单选
-                answer_index = ord(answer) - ord('A')
-                if 0 <= answer_index < len(self.option_buttons):
-                    self.option_buttons[answer_index].setChecked(True)
                     
         # 更新答案显示
         self.answer_label.setText(f"正确答案: {question['答案']}")
         
         # 检查是否已查看过答案
-        if self.current_question in self.viewed_answers:
+        if viewed:
             self.answer_frame.show()
             self.show_answer_btn.setText("看过还想改？")
-            for btn in self.option_buttons:
-                btn.setEnabled(False)
         elif self.submitted:
             self.answer_frame.show()
             self.show_answer_btn.setText("隐藏答案")
-            for btn in self.option_buttons:
-                btn.setEnabled(False)
         else:
             self.answer_frame.hide()
             self.show_answer_btn.setText("查看答案")
-            for btn in self.option_buttons:
-                btn.setEnabled(True)
-                
-        # 重新连接信号
-        self.option_group.buttonClicked.connect(self.save_current_answer)
 
     def save_current_answer(self):
         """保存当前题目的答案"""
-        question = self.questions[self.current_question]
-        if question.get('is_multi', False):
-            # 多选，收集所有被选中的选项
-            answer = ''
-            for i, btn in enumerate(self.option_buttons):
-                if btn.isChecked():
-                    answer += chr(ord('A') + i)
-            if answer:
-                self.user_answers[self.current_question] = answer
-            elif self.current_question in self.user_answers:
-                del self.user_answers[self.current_question]
+        # 按选项顺序收集被选中的选项（单选时最多一个）
+        bit = 1 << self.current_question
+        was_answered = bool(self._answered_mask & bit)
+        answer = ''.join(letter for letter, btn in zip(OPTION_LETTERS, self.option_buttons) if btn.isChecked())
+        if answer:
+            self.user_answers[self.current_question] = answer
+            self._answered_mask |= bit
         else:
-            # 单选
-            checked_button = self.option_group.checkedButton()
-            if checked_button:
-                button_index = self.option_group.id(checked_button)
-                answer = chr(ord('A') + button_index)
-                self.user_answers[self.current_question] = answer
-            else:
-                if self.current_question in self.user_answers:
-                    del self.user_answers[self.current_question]
-        self.update_question_buttons()
-        
-        # 每完成10题自动保存
-        if len(self.user_answers) % 10 == 0:
-            self.auto_save_answers()
+            self.user_answers.pop(self.current_question, None)
+            self._answered_mask &= ~bit
+        # 只有作答状态变化时题号按钮颜色才会改变
+        if was_answered != bool(answer):
+            self.update_question_buttons()
+
+        # 重新开始计时，答案稳定后再自动保存
+        self._save_debounce.start()
+
+    def _rebuild_answer_masks(self):
+        """根据 user_answers 和 viewed_answers 重新计算位掩码"""
+        self._answered_mask = sum(1 << i for i in self.user_answers)
+        self._viewed_mask = sum(1 << i for i in self.viewed_answers)
 
     def update_question_buttons(self):
         """更新题号按钮状态"""
-        for i, btn in enumerate(self.question_buttons):
-            if i < len(self.questions):
-                if self.submitted:
-                    btn.setEnabled(True)
-                    # 正确绿色，答错红色，未作答灰色
-                    if i in self.user_answers:
-                        # 判断正误
-                        user_ans = self.user_answers[i]
-                        correct_ans = str(self.questions[i]['答案']).strip()
-                        if user_ans == correct_ans:
-                            btn.setStyleSheet("QPushButton { background-color: #4CAF50; color: white; }")
-                        else:
-                            btn.setStyleSheet("QPushButton { background-color: #ff4444; color: white; }")
-                    else:
-                        btn.setStyleSheet("QPushButton { background-color: #cccccc; color: black; }")
+        answered = self._answered_mask
+        viewed = self._viewed_mask
+        for i in range(len(self.question_buttons)):
+            if i >= len(self.questions):
+                self._set_question_button_state(i, False, STYLE_DISABLED)
+                continue
+            if self.submitted:
+                # 正确绿色，答错红色，未作答灰色
+                if not answered >> i & 1:
+                    style = STYLE_UNANSWERED
+                elif self.user_answers[i] == self.questions[i]['answer_norm']:
+                    style = STYLE_CORRECT
                 else:
-                    btn.setEnabled(True)
-                    if i in self.viewed_answers:
-                        # 查看过答案的题目显示橙色
-                        btn.setStyleSheet("QPushButton { background-color: #FFA500; color: white; }")
-                    elif i in self.user_answers:
-                        btn.setStyleSheet("QPushButton { background-color: #4CAF50; color: white; }")
-                    elif i == self.current_question:
-                        btn.setStyleSheet("QPushButton { background-color: #2196F3; color: white; }")
-                    else:
-                        btn.setStyleSheet("")
+                    style = STYLE_WRONG
+            elif viewed >> i & 1:
+                # 查看过答案的题目显示橙色
+                style = STYLE_VIEWED
+            elif answered >> i & 1:
+                style = STYLE_ANSWERED
+            elif i == self.current_question:
+                style = STYLE_CURRENT
             else:
-                btn.setEnabled(False)
-                btn.setStyleSheet("QPushButton { background-color: #cccccc; }")
+                style = STYLE_DEFAULT
+            self._set_question_button_state(i, True, style)
+
+    def _set_question_button_state(self, index, enabled, style):
+        """设置题号按钮的启用状态和样式，与上次相同时不做任何操作"""
+        state = (enabled, style)
+        if self._button_states[index] == state:
+            return
+        btn = self.question_buttons[index]
+        btn.setEnabled(enabled)
+        btn.setStyleSheet(style)
+        self._button_states[index] = state
 
     def jump_to_question(self, question_index):
         """跳转到指定题目"""
@@ -619,67 +769,121 @@ class QuestionSystem(QMainWindow):
             # 添加当前题目到查看过的集合
             self.viewed_answers.add(self.current_question)
             # 删除用户的答案（如果存在）
-            if self.current_question in self.user_answers:
-                del self.user_answers[self.current_question]
+            self.user_answers.pop(self.current_question, None)
+            bit = 1 << self.current_question
+            self._viewed_mask |= bit
+            self._answered_mask &= ~bit
             # 禁用所有选项按钮
             for btn in self.option_buttons:
                 btn.setEnabled(False)
             self.update_question_buttons()
 
+    def _start_countdown(self, seconds):
+        """开始倒计时，剩余时间根据单调时钟上的截止时刻计算，不受定时器漏触发影响"""
+        self.remaining_time = seconds
+        self._deadline = time.monotonic() + seconds
+        self.timer.start(1000)
+
+    def _current_remaining_time(self):
+        """按截止时刻计算当前剩余时间（最小化期间标签不刷新，remaining_time 可能已过时）"""
+        if self._deadline is not None:
+            self.remaining_time = max(0, round(self._deadline - time.monotonic()))
+        return self.remaining_time
+
+    def _arm_deadline_timer(self):
+        """在截止时刻触发一次 update_timer"""
+        self._deadline_timer.start(max(0, int((self._deadline - time.monotonic()) * 1000)))
+
+    def _stop_countdown(self):
+        """彻底停止倒计时（提交、时间到或加载已结束的试卷时），剩余时间保留为停止时的值"""
+        self._current_remaining_time()
+        self._deadline = None
+        self.timer.stop()
+        self._deadline_timer.stop()
+
     def update_timer(self):
         """更新倒计时"""
+        self.remaining_time = max(0, round(self._deadline - time.monotonic()))
         if self.remaining_time > 0:
-            self.remaining_time -= 1
-            minutes = self.remaining_time // 60
-            seconds = self.remaining_time % 60
+            if not self.timer.isActive():
+                # 最小化期间由截止时刻的单次定时触发，提前触发时重新定时即可
+                self._arm_deadline_timer()
+                return
+            minutes, seconds = divmod(self.remaining_time, 60)
             self.timer_label.setText(f"剩余时间: {minutes:02d}:{seconds:02d}")
 
             # 最后5分钟变红色闪烁
             if self.remaining_time <= 300:
-                if self.remaining_time % 2 == 0:
-                    self.timer_label.setStyleSheet("color: red; font-weight: bold;")
-                else:
-                    self.timer_label.setStyleSheet("color: darkred; font-weight: bold;")
+                self._set_timer_style(TIMER_STYLE_RED if self.remaining_time % 2 == 0 else TIMER_STYLE_DARKRED)
         else:
-            self.timer.stop()
+            self._stop_countdown()
             self.timer_label.setText("时间到！")
             self.submit_answers()
 
-    def auto_save_answers(self):
-        """自动保存答案到 save 目录"""
+    def _set_timer_style(self, style):
+        """设置倒计时标签样式，与当前样式相同时跳过"""
+        if style is not self._timer_style:
+            self.timer_label.setStyleSheet(style)
+            self._timer_style = style
+
+    def auto_save_answers(self, background=True):
+        """自动保存答案到 save 目录
+
+        Args:
+            background: 是否在后台线程写入文件
+        """
         if not self.questions:
             return
 
         try:
             # 创建保存数据
-            save_data = {
-                "answers": self.user_answers,
-                "timestamp": datetime.now().isoformat(),
-                "start_time": self.start_time.isoformat() if self.start_time else None,
-                "total_questions": len(self.questions),
-                "answered_questions": len(self.user_answers),
-                "original_indices": self.original_indices,
-                "username": self.username,
-                "submitted": False,
-                "viewed_answers": list(self.viewed_answers),
-                "remaining_time": self.remaining_time
-            }
+            now = datetime.now()
+            save_data = self._build_save_data(now, submitted=False)
 
-            # 生成文件名
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"answers_{self.username}_{timestamp}.json"
-            file_path = os.path.join('data', 'recommendation', 'save', filename)
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            # 本场考试已有 save 目录下的答题文件时直接覆盖（dump_json 原子替换），
+            # 避免每次自动保存都新增一个文件
+            file_path = self.current_answer_file
+            if not file_path or os.path.dirname(os.path.abspath(file_path)) != os.path.abspath(self._save_dir):
+                filename = f"answers_{self.username}_{now:%Y%m%d_%H%M%S}.json"
+                file_path = os.path.join(self._save_dir, filename)
 
             # 保存文件
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(save_data, f, ensure_ascii=False, indent=2)
+            if background:
+                self._io_pool.start(BackgroundTask("自动保存", dump_json, file_path, save_data))
+            else:
+                dump_json(file_path, save_data)
             
             # 更新当前答题文件路径
             self.current_answer_file = file_path
         except Exception as e:
             logging.error(f"自动保存失败：{str(e)}")
 
+    def _update_save_data_static(self):
+        """缓存保存文件中整场考试不变的字段，每次保存时直接合并"""
+        self._save_data_static = {
+            "start_time": self.start_time.isoformat() if self.start_time else None,
+            "total_questions": len(self.questions),
+            "original_indices": self.original_indices,
+            "username": self.username,
+        }
+
+    def _build_save_data(self, now, submitted, **extra):
+        """组装保存文件内容：考试不变字段 + 当前答题状态，提交时的额外字段通过 extra 传入
+
+        answers 总是复制一份（键转为字符串），可以安全地交给后台线程写入。
+        """
+        save_data = {
+            **self._save_data_static,
+            "answers": {str(k): v for k, v in self.user_answers.items()},
+            "timestamp": now.isoformat(),
+            "answered_questions": len(self.user_answers),
+            "submitted": submitted,
+            "viewed_answers": list(self.viewed_answers),
+            "remaining_time": self._current_remaining_time(),
+        }
+        save_data.update(extra)
+        return save_data
+
     def save_answers(self):
         """手动保存答案到 save 目录"""
         if not self.user_answers:
@@ -688,37 +892,25 @@ class QuestionSystem(QMainWindow):
 
         try:
             # 创建保存数据
-            save_data = {
-                "answers": self.user_answers,
-                "timestamp": datetime.now().isoformat(),
-                "start_time": self.start_time.isoformat() if self.start_time else None,
-                "total_questions": len(self.questions),
-                "answered_questions": len(self.user_answers),
-                "original_indices": self.original_indices,
-                "username": self.username,
-                "submitted": False,
-                "viewed_answers": list(self.viewed_answers),
-                "remaining_time": self.remaining_time
-            }
+            now = datetime.now()
+            save_data = self._build_save_data(now, submitted=False)
 
             # 生成文件名
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"answers_{self.username}_{timestamp}.json"
-            file_path = os.path.join('data', 'recommendation', 'save', filename)
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
-
-            # 删除该用户之前的临时保存文件
-            save_dir = Path('data/recommendation/save')
-            if save_dir.exists():
-                for old_file in save_dir.glob(f"answers_{self.username}_*.json"):
-                    try:
-                        old_file.unlink()
-                    except Exception as e:
-                        logging.error(f"删除旧临时文件失败: {e}")
+            filename = f"answers_{self.username}_{now:%Y%m%d_%H%M%S}.json"
+            file_path = os.path.join(self._save_dir, filename)
+
+            # 删除该用户之前的临时保存文件（先等待后台的自动保存写完）
+            self._io_pool.waitForDone()
+            for old_file in list_user_save_files(self._save_dir, self.username):
+                try:
+                    os.unlink(old_file)
+                except FileNotFoundError:
+                    pass
+                except Exception as e:
+                    logging.error(f"删除旧临时文件失败: {e}")
 
             # 保存新的临时文件
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(save_data, f, ensure_ascii=False, indent=2)
+            dump_json(file_path, save_data)
 
             auto_information(self, "成功", f"答案已保存到：{file_path}")
             self.current_answer_file = file_path
@@ -727,42 +919,29 @@ class QuestionSystem(QMainWindow):
 
     def submit_answers(self):
         """提交答案"""
-        self.timer.stop()
+        self._stop_countdown()
+        self._save_debounce.stop()  # 提交后不再自动保存
         self.submitted = True
 
-        # 计算得分
-        correct_count = 0
+        # 计算得分：作答且未查看过答案、并与正确答案一致才算答对
         total_count = len(self.questions)
-        wrong_questions = set()
+        user_ans = [self.user_answers.get(i, '') for i in range(total_count)]
+        is_correct = [
+            ans != '' and i not in self.viewed_answers and ans == question['answer_norm']
+            for i, (ans, question) in enumerate(zip(user_ans, self.questions))
+        ]
+        correct_count = sum(is_correct)
 
         # 初始化BKT模型
         from models.bkt_model import BKTModel
         bkt_model = BKTModel()
 
-        # 收集答题历史
-        answer_history = {}
-        for i, question in enumerate(self.questions):
-            q_id = str(i + 1)  # 转换为1开始的题号
-            if q_id not in answer_history:
-                answer_history[q_id] = []
-            
-            # 判断答案是否正确
-            is_correct = False
-            if i in self.user_answers and i not in self.viewed_answers:
-                user_ans = self.user_answers[i]
-                correct_ans = str(question['答案']).strip()
-                is_correct = user_ans == correct_ans
-                if is_correct:
-                    correct_count += 1
-                else:
-                    wrong_questions.add(i)
-            
-            # 添加到答题历史
-            answer_history[q_id].append({
-                'answer': self.user_answers.get(i, ''),
-                'is_correct': is_correct,
-                'timestamp': datetime.now().isoformat()
-            })
+        # 收集答题历史（同一次提交的记录使用相同的时间戳），题号从1开始
+        now_iso = datetime.now().isoformat()
+        answer_history = {
+            str(i + 1): [{'answer': ans, 'is_correct': correct, 'timestamp': now_iso}]
+            for i, (ans, correct) in enumerate(zip(user_ans, is_correct))
+        }
 
         score = (correct_count / total_count) * 100 if total_count > 0 else 0
 
@@ -806,60 +985,37 @@ class QuestionSystem(QMainWindow):
         # 刷新当前题目显示
         self.update_question_display()
 
-        # 组装要保存的数据
-        save_data = {
-            "answers": {str(k): v for k, v in self.user_answers.items()},
-            "timestamp": datetime.now().isoformat(),
-            "start_time": self.start_time.isoformat() if self.start_time else None,
-            "total_questions": len(self.questions),
-            "answered_questions": len(self.user_answers),
-            "original_indices": self.original_indices,
-            "username": self.username,
-            "submitted": True,
-            "viewed_answers": list(self.viewed_answers),
-            "remaining_time": self.remaining_time,
-            "unanswered_questions": [i for i in range(len(self.questions)) if i not in self.user_answers],
-            "mastered_questions": list(mastered_questions),
-            "mastery_data": {
+        # 组装要保存的数据（列表只构建一次，与下面的答题结果信号共用）
+        answered = self._answered_mask
+        mastered_list = list(mastered_questions)
+        now = datetime.now()
+        save_data = self._build_save_data(
+            now,
+            submitted=True,
+            unanswered_questions=[i for i in range(total_count) if not answered >> i & 1],
+            mastered_questions=mastered_list,
+            mastery_data={
                 q_id: {
                     "mastery_probability": data["mastery_probability"],
                     "correct_rate": data["correct_rate"],
                     "attempt_count": data["attempt_count"]
                 }
                 for q_id, data in mastery.items()
-            }
-        }
+            },
+        )
+
+        # 等待尚未完成的后台写入和初始推荐处理，避免与下面的写入冲突
+        self._io_pool.waitForDone()
 
         try:
             # 保存到history
             os.makedirs('data/recommendation/history', exist_ok=True)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"answers_{self.username}_{timestamp}.json"
+            filename = f"answers_{self.username}_{now:%Y%m%d_%H%M%S}.json"
             file_path = os.path.join('data', 'recommendation', 'history', filename)
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(save_data, f, ensure_ascii=False, indent=2)
+            dump_json(file_path, save_data)
 
             # 删除save目录下的所有临时文件
-            save_dir = Path('data/recommendation/save')
-            if save_dir.exists():
-                # 获取所有该用户的临时文件
-                temp_files = list(save_dir.glob(f"answers_{self.username}_*.json"))
-                for temp_file in temp_files:
-                    try:
-                        # 确保文件存在且可访问
-                        if temp_file.exists() and temp_file.is_file():
-                            # 尝试关闭可能打开的文件句柄
-                            try:
-                                if hasattr(self, 'current_answer_file') and self.current_answer_file:
-                                    with open(self.current_answer_file, 'r') as f:
-                                        pass  # 确保文件句柄已关闭
-                            except:
-                                pass
-                            # 删除文件
-                            temp_file.unlink()
-                            logging.info(f"成功删除临时文件: {temp_file}")
-                    except Exception as e:
-                        logging.error(f"删除临时文件失败 {temp_file}: {e}")
+            self._io_pool.start(BackgroundTask("清理临时文件", _remove_user_save_files, self._save_dir, self.username))
 
             self.current_answer_file = None
 
@@ -869,15 +1025,18 @@ class QuestionSystem(QMainWindow):
             processor.process_answer_file(file_path)
 
             # 删除旧的推荐文件
-            recommendation_dir = Path("data/models/model_yh")
-            if recommendation_dir.exists():
-                old_recommendations = list(recommendation_dir.glob("recommendation_*.json"))
-                for old_file in old_recommendations:
-                    try:
-                        old_file.unlink()
-                        logging.info(f"成功删除旧推荐文件: {old_file}")
-                    except Exception as e:
-                        logging.error(f"删除旧推荐文件失败 {old_file}: {e}")
+            recommendation_dir = os.path.join("data", "models", "model_yh")
+            if os.path.isdir(recommendation_dir):
+                with os.scandir(recommendation_dir) as entries:
+                    for entry in entries:
+                        name = entry.name
+                        if not (name.startswith("recommendation_") and name.endswith(".json")):
+                            continue
+                        try:
+                            os.unlink(entry.path)
+                            logging.info(f"成功删除旧推荐文件: {entry.path}")
+                        except OSError as e:
+                            logging.error(f"删除旧推荐文件失败 {entry.path}: {e}")
 
         except Exception as e:
             logging.error(f"保存历史记录失败: {e}")
@@ -885,16 +1044,16 @@ class QuestionSystem(QMainWindow):
         # 发送答题结果信号
         answer_data = {
             'timestamp': datetime.now().isoformat(),
-            'start_time': self.start_time.isoformat() if self.start_time else None,
+            'start_time': save_data['start_time'],
             'username': self.username,
             'score': score,
             'correct_count': correct_count,
             'total_questions': total_count,
             'user_answers': self.user_answers,
-            'viewed_answers': list(self.viewed_answers),
+            'viewed_answers': save_data['viewed_answers'],
             'original_indices': self.original_indices,
             'question_times': {},
-            'mastered_questions': list(mastered_questions),
+            'mastered_questions': mastered_list,
             'mastery_data': save_data['mastery_data']
         }
         self.answer_submitted.emit(answer_data)
@@ -904,25 +1063,24 @@ class QuestionSystem(QMainWindow):
     def load_answer_file(self, file_path):
         """加载保存的答案文件"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = load_json(file_path)
+            # 开始时间只解析一次，下面判断超时和恢复开始时间共用
+            start_time = datetime.fromisoformat(data['start_time']) if data.get('start_time') else None
                 
             # 检查是否超过考试时间（只在未提交时检查）
-            if not data.get('submitted', False) and 'start_time' in data:
-                start_time = datetime.fromisoformat(data['start_time'])
-                current_time = datetime.now()
-                time_diff = (current_time - start_time).total_seconds()
+            if not data.get('submitted', False) and start_time is not None:
+                time_diff = (datetime.now() - start_time).total_seconds()
                 
                 # 如果超过50分钟，自动结束考试
                 if time_diff > self.total_time:
                     auto_warning(self, "提示", "考试时间已超过50分钟，将自动结束考试")
                     self.submitted = True
-                    self.timer.stop()
+                    self._stop_countdown()
                     self.show_answer_btn.setText("隐藏答案")
                     self.answer_frame.show()
                     self.remaining_time = 0  # 设置剩余时间为0
                     self.timer_label.setText("剩余时间: 00:00")
-                    self.timer_label.setStyleSheet("color: red; font-weight: bold;")
+                    self._set_timer_style(TIMER_STYLE_RED)
                     
                     # 记录未完成的题目
                     if 'answers' in data:
@@ -930,19 +1088,17 @@ class QuestionSystem(QMainWindow):
                         all_questions = set(range(len(self.original_indices)))
                         unfinished_questions = all_questions - answered_questions
                         
-                        # 更新json文件，记录未完成的题目
+                        # 更新json文件，记录未完成的题目（后台写入，界面直接进入考试结束状态）
                         data['unfinished_questions'] = list(unfinished_questions)
                         data['remaining_time'] = 0
-                        with open(file_path, 'w', encoding='utf-8') as f:
-                            json.dump(data, f, ensure_ascii=False, indent=2)
+                        self._io_pool.start(BackgroundTask("更新答题文件", dump_json, file_path, dict(data)))
                 else:
                     # 计算剩余时间
-                    self.remaining_time = self.total_time - int(time_diff)
-                    self.timer.start(1000)
+                    self._start_countdown(self.total_time - int(time_diff))
             else:
                 # 如果是已提交的试卷，直接设置剩余时间为0
+                self._stop_countdown()
                 self.remaining_time = 0
-                self.timer.stop()
 
             # 恢复原始题号映射
             if 'original_indices' in data:
@@ -956,14 +1112,10 @@ class QuestionSystem(QMainWindow):
                 auto_critical(self, "错误", "题库文件不存在，无法恢复答题记录")
                 return
 
-            df = pd.read_excel(local_file)
-            original_data = df.to_dict('records')
+            _, original_data = load_question_bank(local_file)
 
             # 按 original_indices 顺序重排题目
-            self.questions = [original_data[i] for i in self.original_indices]
-            for q in self.questions:
-                ans = str(q['答案']).strip()
-                q['is_multi'] = len(ans) > 1
+            self.questions = list(map(original_data.__getitem__, self.original_indices))
 
             self.current_question = 0
             self.user_answers = {}
@@ -977,20 +1129,22 @@ class QuestionSystem(QMainWindow):
             # 恢复查看过的答案
             if 'viewed_answers' in data:
                 self.viewed_answers = set(int(idx) for idx in data['viewed_answers'])
+            self._rebuild_answer_masks()
                 
             # 恢复开始时间
-            if 'start_time' in data:
-                self.start_time = datetime.fromisoformat(data['start_time'])
+            self.start_time = start_time
                 
+            self._update_save_data_static()
+
             # 恢复提交状态
             if 'submitted' in data and data['submitted']:
                 self.submitted = True
-                self.timer.stop()
+                self._stop_countdown()
                 self.show_answer_btn.setText("隐藏答案")
                 self.answer_frame.show()
                 self.remaining_time = 0  # 确保倒计时显示为00:00
                 self.timer_label.setText("剩余时间: 00:00")
-                self.timer_label.setStyleSheet("color: red; font-weight: bold;")
+                self._set_timer_style(TIMER_STYLE_RED)
 
             # 更新界面
             self.update_question_display()
@@ -1005,6 +1159,18 @@ class QuestionSystem(QMainWindow):
             auto_critical(self, "错误", f"加载答案文件失败：{str(e)}")
             self.load_local_excel()  # 如果加载失败，重新加载题库
 
+    def changeEvent(self, event):
+        """窗口最小化时停止每秒刷新，只保留截止时刻的单次定时；恢复后按截止时刻重新计算剩余时间"""
+        if event.type() == QEvent.Type.WindowStateChange and self._deadline is not None and not self.submitted:
+            if self.isMinimized():
+                self.timer.stop()
+                self._arm_deadline_timer()
+            elif not self.timer.isActive():
+                self._deadline_timer.stop()
+                self.timer.start(1000)
+                self.update_timer()
+        super().changeEvent(event)
+
     def closeEvent(self, event):
         """处理窗口关闭事件
         1. 只有未提交时才自动保存答题进度到 save 目录，并弹出主界面。
@@ -1012,9 +1178,12 @@ class QuestionSystem(QMainWindow):
         这样可避免提交后出现两个主界面，也不会生成多余 save 文件影响掌握度统计。
         """
         try:
+            self._save_debounce.stop()
             # 只有未提交时才自动保存
             if not self.submitted:
-                self.auto_save_answers()
+                # 先等待后台的自动保存完成，再同步写入最新进度
+                self._io_pool.waitForDone()
+                self.auto_save_answers(background=False)
                 # 只在未提交时弹主界面
                 from main_window import MainWindow
                 main_window = MainWindow(username=self.username)
@@ -1,11 +1,63 @@
 import requests
 import json
+import os
 from pathlib import Path
 import logging
-from PyQt6.QtWidgets import QMessageBox, QCheckBox, QPushButton
-from PyQt6.QtCore import QObject, pyqtSignal, QTimer
+from PyQt6.QtCore import QObject, pyqtSignal, QTimer, QRunnable, QThreadPool
 import re
-import datetime
+import time
+import functools
+
+try:
+    import orjson  # C 实现的 JSON 解析，速度更快
+except ImportError:
+    orjson = None
+
+# 版本号匹配规则（模块加载时编译一次）
+_VERSION_RE = re.compile(r'(\d+\.\d+\.\d+)')
+
+
+@functools.lru_cache(maxsize=128)
+def _parse_version(version):
+    """将 "1.2.3" 形式的版本号解析为整数元组，格式错误时抛出 ValueError
+
+    去掉末尾的 0（"1.2.0" 与 "1.2" 得到相同结果），元组可直接比较大小，无需补齐长度。
+    """
+    parts = [int(x) for x in version.split('.')]
+    while parts and parts[-1] == 0:
+        parts.pop()
+    return tuple(parts)
+
+
+@functools.lru_cache(maxsize=1)
+def _read_current_version():
+    """获取当前程序版本号（运行期间不会变化，只读取一次 version.txt）"""
+    try:
+        version = Path("data/static/version.txt").read_text(encoding="utf-8").strip()
+        if version:  # 确保版本号不为空
+            return version
+        logging.error("version.txt 文件为空")
+        return None
+    except FileNotFoundError:
+        logging.error("version.txt 文件不存在")
+        return None
+    except Exception as e:
+        logging.error(f"获取当前版本失败: {e}")
+        return None
+
+
+class _UpdateCheckTask(QRunnable):
+    """在线程池中执行一次更新检查"""
+
+    def __init__(self, checker):
+        super().__init__()
+        self.checker = checker
+
+    def run(self):
+        try:
+            self.checker.check_for_updates()
+        finally:
+            self.checker._check_running = False
 
 
 class UpdateChecker(QObject):
@@ -13,107 +65,195 @@ class UpdateChecker(QObject):
 
     update_available = pyqtSignal(str, str)  # 信号：新版本号, 更新说明
 
+    # 检查频率限制在所有实例间共享（每个主窗口都会新建检查器）
+    _min_interval = 3600.0  # 两次联网检查的最小间隔（秒）
+    _next_check = 0.0  # 早于此时刻（time.monotonic）的检查直接返回上次结果
+    _last_result = False
+
     def __init__(self):
         super().__init__()
-        self.current_version = self._get_current_version()  # 自动获取当前版本
+        self.current_version = _read_current_version()  # 自动获取当前版本
+        self._current_tuple = self._parse_current_version()  # 当前版本号的整数元组，只解析一次
         self.github_api_url = "https://api.github.com/repos/xdhdyp/Xdhdyp-BKT/releases/latest"
         self.github_release_url = "https://github.com/xdhdyp/Xdhdyp-BKT/releases/latest"
         self.config_file = Path("data/config/update_config.json")
+        self.release_cache_file = Path("data/config/release_cache.json")
         self.ignored_versions = self._load_ignored_versions()
+        self.release_cache = self._load_release_cache()
+        self._check_running = False  # 是否有后台检查正在进行
+
+        # 复用同一个会话，多次检查时保持与 GitHub 的连接（省去 TCP/TLS 握手）
+        self._session = requests.Session()
+        self._session.headers.update({
+            "User-Agent": "BKT-Simulation-Exam-System",  # 添加User-Agent头
+            "Accept": "application/vnd.github+json"
+        })
 
     def _load_ignored_versions(self):
-        """加载已忽略的版本列表"""
+        """加载已忽略的版本集合"""
         try:
             if self.config_file.exists():
-                with open(self.config_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    if isinstance(data, dict) and "ignored_versions" in data:
-                        return data["ignored_versions"]
-                    return []
-            return []
+                data = json.loads(self.config_file.read_text(encoding="utf-8"))
+                if isinstance(data, dict) and isinstance(data.get("ignored_versions"), list):
+                    return set(data["ignored_versions"])
+                return set()
+            return set()
         except Exception as e:
             logging.error(f"加载忽略版本配置失败: {e}")
-            return []
+            return set()
 
     def _save_ignored_versions(self):
-        """保存已忽略的版本列表"""
+        """保存已忽略的版本（先写临时文件再原子替换，避免写到一半留下损坏的配置）"""
         try:
             self.config_file.parent.mkdir(parents=True, exist_ok=True)
-            # 确保ignored_versions是列表类型
-            if not isinstance(self.ignored_versions, list):
-                self.ignored_versions = []
-                logging.warning("ignored_versions不是列表类型，已重置为空列表")
+            # 确保ignored_versions是集合类型
+            if not isinstance(self.ignored_versions, set):
+                self.ignored_versions = set()
+                logging.warning("ignored_versions不是集合类型，已重置为空集合")
 
             data = {
-                "ignored_versions": self.ignored_versions,
-                "last_update": str(datetime.datetime.now())
+                "ignored_versions": sorted(self.ignored_versions),  # 内存中用集合，写盘时转为有序列表
+                "last_update": time.time()  # Unix 时间戳
             }
-            with open(self.config_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            tmp_file = Path(f"{self.config_file}.tmp")
+            tmp_file.write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp_file, self.config_file)
             logging.info(f"已保存忽略版本配置到: {self.config_file}")
         except Exception as e:
             logging.error(f"保存忽略版本配置失败: {e}")
 
-    def _get_current_version(self):
-        """获取当前程序版本号"""
+    def _load_release_cache(self):
+        """加载上次获取的发布信息（含已提取的版本号）及其 ETag"""
         try:
-            version_file = Path("data/static/version.txt")
-            if version_file.exists():
-                with open(version_file, "r") as f:
-                    version = f.read().strip()
-                    if version:  # 确保版本号不为空
-                        return version
-            logging.error("version.txt 文件不存在或为空")
-            return None
+            if self.release_cache_file.exists():
+                data = json.loads(self.release_cache_file.read_text(encoding="utf-8"))
+                release_info = data.get("release_info") if isinstance(data, dict) else None
+                if isinstance(release_info, dict) and "latest_version" in release_info and data.get("etag"):
+                    return data
+            return {}
+        except Exception as e:
+            logging.error(f"加载发布信息缓存失败: {e}")
+            return {}
+
+    def _save_release_cache(self, etag, release_info):
+        """保存发布信息及其 ETag"""
+        try:
+            self.release_cache = {
+                "etag": etag,
+                "release_info": release_info
+            }
+            self.release_cache_file.parent.mkdir(parents=True, exist_ok=True)
+            self.release_cache_file.write_text(
+                json.dumps(self.release_cache, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
         except Exception as e:
-            logging.error(f"获取当前版本失败: {e}")
+            logging.error(f"保存发布信息缓存失败: {e}")
+
+    def _fetch_release_info(self):
+        """获取最新发布信息，返回 {"tag_name", "body", "latest_version"}，请求失败时返回 None
+
+        带上次的 ETag 发送条件请求，GitHub 返回 304（未变化）时直接使用本地缓存，
+        不再下载和解析完整的 JSON、也不再提取版本号，且不计入匿名访问的频率限制。
+        """
+        headers = {}
+        if self.release_cache:
+            headers["If-None-Match"] = self.release_cache["etag"]
+        # 添加超时参数，避免网络请求卡住
+        response = self._session.get(self.github_api_url, headers=headers, timeout=10)
+        self._apply_rate_limit(response)
+        if response.status_code == 304:
+            return self.release_cache["release_info"]
+        if response.status_code == 200:
+            # 直接解析响应的原始字节，省去 response.json() 的编码探测和解码
+            data = orjson.loads(response.content) if orjson else json.loads(response.content)
+            release_info = {
+                "tag_name": data.get("tag_name", ""),
+                "body": data.get("body", ""),
+                "latest_version": self._extract_version(data)
+            }
+            etag = response.headers.get("ETag")
+            if etag:
+                self._save_release_cache(etag, release_info)
+            return release_info
+        return None
+
+    def _apply_rate_limit(self, response):
+        """根据 GitHub 的限流响应头推迟下一次检查，避免被限流期间反复请求"""
+        wait = 0.0
+        try:
+            if response.status_code in (403, 429) and response.headers.get("Retry-After"):
+                wait = float(response.headers["Retry-After"])
+            elif response.headers.get("X-RateLimit-Remaining") == "0":
+                wait = float(response.headers["X-RateLimit-Reset"]) - time.time()
+        except (KeyError, ValueError):
+            return
+        if wait > 0:
+            UpdateChecker._next_check = max(UpdateChecker._next_check, time.monotonic() + wait)
+            logging.warning(f"GitHub API 访问受限，{int(wait)} 秒内不再检查更新")
+
+    def _extract_version(self, release_info):
+        """从发布标签（或发布说明）中提取 x.y.z 格式的版本号，提取失败返回 None
+
+        标签中任意位置的 x.y.z 都能直接匹配，因此无需先去除 v、Xdhdyp-BKT_ 等前缀；
+        匹配结果本身就是 x.y.z 格式，也无需再次校验。
+        """
+        tag = release_info['tag_name'] or ''
+        # 快速路径：最常见的 "v1.2.3" / "1.2.3" 标签直接拆分校验，不经过正则
+        candidate = tag[1:] if tag[:1] in ('v', 'V') else tag
+        parts = candidate.split('.')
+        if len(parts) == 3 and all(p.isascii() and p.isdigit() for p in parts):
+            return candidate
+
+        match = _VERSION_RE.search(tag) or _VERSION_RE.search(release_info.get('body') or '')
+        if match:
+            return match.group(1)
+        logging.warning(f"无法从标签或发布说明中提取版本号: {tag}")
+        return None
+
+    def _parse_current_version(self):
+        """解析当前版本号，缺失或格式错误时返回 None"""
+        if not self.current_version:
             return None
+        try:
+            return _parse_version(self.current_version)
+        except ValueError:
+            logging.error(f"版本号格式错误: {self.current_version}")
+            return None
+
+    def start_update_check(self):
+        """在后台线程中检查更新，不阻塞界面；发现新版本时通过 update_available 信号通知
+
+        信号在工作线程中发出，连接到界面线程对象的槽函数会自动以排队方式执行。
+        """
+        if self._check_running:
+            return
+        self._check_running = True
+        QThreadPool.globalInstance().start(_UpdateCheckTask(self))
 
     def check_for_updates(self):
-        """检查更新"""
+        """检查更新（同步执行，会等待网络请求完成）
+
+        距上次检查不足 _min_interval 时不再联网，直接返回上次的结果。
+        """
+        now = time.monotonic()
+        if now < UpdateChecker._next_check:
+            return UpdateChecker._last_result
+        UpdateChecker._next_check = now + UpdateChecker._min_interval
+        UpdateChecker._last_result = self._check_for_updates()
+        return UpdateChecker._last_result
+
+    def _check_for_updates(self):
+        """联网检查一次更新"""
         try:
             # 确保有当前版本号
-            if not self.current_version:
+            if self._current_tuple is None:
                 logging.error("无法获取当前版本号，跳过更新检查")
                 return False
 
             # 获取最新发布版本信息
-            headers = {
-                "User-Agent": "BKT-Simulation-Exam-System"  # 添加User-Agent头
-            }
-            # 添加超时参数，避免网络请求卡住
-            response = requests.get(self.github_api_url, headers=headers, timeout=10)
-            if response.status_code == 200:
-                release_info = response.json()
-                latest_version = release_info['tag_name']
-
-                # 兼容多种标签格式，提取版本号
-                # 1. 先尝试正则提取 x.x.x
-                match = re.search(r'(\d+\.\d+\.\d+)', latest_version)
-                if match:
-                    latest_version = match.group(1)
-                else:
-                    # 2. 如果没提取到，再尝试去除常见前缀
-                    for prefix in ['v', 'BKT-Xhydra_', 'Xdhdyp-BKT_', 'Xdhdyp-BKT']:
-                        if latest_version.startswith(prefix):
-                            latest_version = latest_version.replace(prefix, '')
-                    # 3. 再次尝试正则提取
-                    match2 = re.search(r'(\d+\.\d+\.\d+)', latest_version)
-                    if match2:
-                        latest_version = match2.group(1)
-                    else:
-                        # 4. 最后尝试从发布说明body中提取
-                        body = release_info.get('body', '')
-                        match3 = re.search(r'(\d+\.\d+\.\d+)', body)
-                        if match3:
-                            latest_version = match3.group(1)
-                        else:
-                            logging.warning(f"无法从标签或发布说明中提取版本号: {release_info['tag_name']}")
-                            return False
-
-                # 验证提取的版本号格式
-                if not re.match(r'^\d+\.\d+\.\d+$', latest_version):
-                    logging.warning(f"提取的版本号格式不正确: {latest_version}")
+            release_info = self._fetch_release_info()
+            if release_info:
+                latest_version = release_info['latest_version']
+                if not latest_version:
                     return False
 
                 # 检查是否已忽略此版本
@@ -121,15 +261,16 @@ class UpdateChecker(QObject):
                     logging.info(f"版本 {latest_version} 已被用户忽略")
                     return False
 
-                # 比较版本号
-                if self._compare_versions(latest_version, self.current_version) > 0:
+                # 比较版本号（整数元组直接比较）
+                latest_tuple = _parse_version(latest_version)
+                if latest_tuple > self._current_tuple:
                     # 发送更新信号
                     self.update_available.emit(
                         latest_version,
                         release_info.get('body', '有新版本可用')
                     )
                     return True
-                elif self._compare_versions(latest_version, self.current_version) < 0:
+                elif latest_tuple < self._current_tuple:
                     logging.info(f"当前版本 {self.current_version} 比 GitHub 版本 {latest_version} 更新")
                     return False
             return False
@@ -138,31 +279,11 @@ class UpdateChecker(QObject):
             logging.error(f"检查更新失败: {e}")
             return False
 
-    def _compare_versions(self, version1, version2):
-        """比较版本号，返回1表示version1更新，-1表示version2更新，0表示相同"""
-        try:
-            # 确保版本号格式正确
-            v1_parts = [int(x) for x in version1.split('.')]
-            v2_parts = [int(x) for x in version2.split('.')]
-
-            # 补齐版本号长度
-            max_length = max(len(v1_parts), len(v2_parts))
-            v1_parts.extend([0] * (max_length - len(v1_parts)))
-            v2_parts.extend([0] * (max_length - len(v2_parts)))
-
-            # 逐位比较
-            for v1, v2 in zip(v1_parts, v2_parts):
-                if v1 > v2:
-                    return 1
-                elif v1 < v2:
-                    return -1
-            return 0
-        except ValueError as e:
-            logging.error(f"版本号格式错误: {version1} 或 {version2}")
-            return 0
-
     def show_update_dialog(self, parent, new_version, update_info):
         """显示更新对话框"""
+        # 对话框控件只在发现新版本时用到，延迟导入以减少仅做检查时的加载开销
+        from PyQt6.QtWidgets import QMessageBox, QCheckBox, QPushButton
+
         msg = QMessageBox(parent)
         msg.setIcon(QMessageBox.Icon.Information)
         msg.setWindowTitle("发现新版本")
@@ -195,7 +316,7 @@ class UpdateChecker(QObject):
             if checkbox.isChecked():
                 # 如果用户选择不再提醒，将此版本添加到忽略列表
                 if new_version not in self.ignored_versions:
-                    self.ignored_versions.append(new_version)
+                    self.ignored_versions.add(new_version)
                     self._save_ignored_versions()
                     logging.info(f"已将版本 {new_version} 添加到忽略列表")
 
@@ -239,7 +360,7 @@ if __name__ == "__main__":
     checker.update_available.connect(on_update_available)
 
     # 使用定时器延迟执行更新检查，确保窗口已经显示
-    QTimer.singleShot(1000, lambda: checker.check_for_updates())
+    QTimer.singleShot(1000, checker.start_update_check)
 
     # 运行应用
     sys.exit(app.exec())